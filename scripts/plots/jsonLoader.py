@@ -0,0 +1,66 @@
+# Shared JSON loader for the plotting scripts and selectConfigs.py.
+# Uses orjson when it is installed (C parser, several times faster than the stdlib json)
+# and caches the parsed object, so plots drawn in the same process parse each file only once.
+# The cache is keyed on (path, modification time): a rewritten results file is parsed again.
+# The cached object is shared between callers: treat it as read-only.
+# Single-pass reductions can use iter_results instead, which streams the entries with ijson when it is installed
+# and the file is not cached yet.
+
+import os
+from collections import OrderedDict
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Parsed files, most recently used last: (path, mtime) -> parsed object
+_JSON_CACHE_SIZE = 4
+_json_cache = OrderedDict()
+
+def _load_json(filename, mtime):
+    key = (filename, mtime)
+    data = _json_cache.get(key)
+    if data is not None:
+        _json_cache.move_to_end(key)
+        return data
+    with open(filename, 'rb') as f:
+        data = orjson.loads(f.read()) if orjson is not None else json.load(f)
+    _json_cache[key] = data
+    if len(_json_cache) > _JSON_CACHE_SIZE:
+        _json_cache.popitem(last=False)
+    return data
+
+def load_json(filename):
+    return _load_json(filename, os.path.getmtime(filename))
+
+@lru_cache(maxsize=4)
+def _load_results_by_matrix(filename, mtime):
+    by_matrix = {}
+    for result in _load_json(filename, mtime)['results']:
+        by_matrix.setdefault(result['matrix']['name'], []).append(result)
+    return by_matrix
+
+def load_results_by_matrix(filename):
+    # Group the 'results' entries by matrix name once per file,
+    # so per-matrix lookups do not rescan the whole results list
+    return _load_results_by_matrix(filename, os.path.getmtime(filename))
+
+def iter_results(filename):
+    # Yields the 'results' entries one at a time.
+    # A file already parsed by load_json is served from the cache;
+    # otherwise with ijson the file is parsed incrementally, so only one entry is in memory at once,
+    # and without it the file is fully parsed (and cached).
+    mtime = os.path.getmtime(filename)
+    if ijson is None or (filename, mtime) in _json_cache:
+        yield from _load_json(filename, mtime)['results']
+        return
+    with open(filename, 'rb') as f:
+        yield from ijson.items(f, 'results.item', use_float=True)
@@ -1,30 +1,68 @@
+import mmap
 import os
 import re
+from collections import defaultdict
+from functools import lru_cache
+import matplotlib
+matplotlib.use("Agg") # batch rendering only, no GUI backend
 import matplotlib.pyplot as plt
 import numpy as np
 
-def parse_perf_file(filepath):
-    """Extracts miss rates (%) plus elapsed time and config string from perf file."""
-    with open(filepath) as f:
-        text = f.read()
-    def extract_int(pattern):
-        m = re.search(pattern, text)
-        return int(m.group(1).replace(",", "")) if m else None
-    def extract_float(pattern):
-        m = re.search(pattern, text)
-        return float(m.group(1)) if m else None
-    l1_loads = extract_int(r'([0-9,]+)\s+L1-dcache-loads')
-    l1_misses = extract_int(r'([0-9,]+)\s+L1-dcache-load-misses')
-    llc_loads = extract_int(r'([0-9,]+)\s+LLC-loads')
-    llc_misses = extract_int(r'([0-9,]+)\s+LLC-load-misses')
-    cache_refs = extract_int(r'([0-9,]+)\s+cache-references')
-    cache_misses = extract_int(r'([0-9,]+)\s+cache-misses')
-    elapsed = extract_float(r'([0-9.]+) seconds time elapsed')
+# perf counters behind each field returned by parse_perf_file: (references, misses)
+PERF_FIELDS = {
+    "l1": (b'L1-dcache-loads', b'L1-dcache-load-misses'),
+    "llc": (b'LLC-loads', b'LLC-load-misses'),
+    "cm": (b'cache-references', b'cache-misses'),
+}
+CONFIG_RE = re.compile(r'(best|median|worst)_T(\d+)_S([\w]+)_C(\d+)')
+BEST_FILE_RE = re.compile(r'perf_(.+?)\.mtx_best_.*\.txt')
+SEQ_FILE_RE = re.compile(r'seq_perf_(.+?)\.mtx\.txt')
+
+@lru_cache(maxsize=None)
+def perf_regex(fields):
+    """Single pattern matching only the counters of the requested fields (plus elapsed time if asked),
+    so each file is scanned once and unused counters are never matched. None if nothing is requested."""
+    alternatives = []
+    counters = [name for field in fields if field in PERF_FIELDS for name in PERF_FIELDS[field]]
+    if counters:
+        alternatives.append(rb'(?P<value>[0-9,]+)\s+(?P<counter>' + b'|'.join(map(re.escape, counters)) + rb')')
+    if "elapsed" in fields:
+        alternatives.append(rb'(?P<elapsed>[0-9.]+) seconds time elapsed')
+    return re.compile(b'|'.join(alternatives)) if alternatives else None
+
+def scan_perf_counters(filepath, pattern):
+    """Returns {counter name (bytes): value} and the elapsed time, scanning the mapped file in place."""
+    counters = {}
+    elapsed = None
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0: # an empty file cannot be mapped
+            return counters, elapsed
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for m in pattern.finditer(mm):
+                if m.lastgroup == 'counter':
+                    # keep the first occurrence of each counter
+                    counters.setdefault(m['counter'], int(m['value'].replace(b",", b"")))
+                elif elapsed is None:
+                    elapsed = float(m['elapsed'])
+    return counters, elapsed
+
+@lru_cache(maxsize=None)
+def parse_perf_file(filepath, fields=("l1", "llc", "cm", "elapsed")):
+    """Extracts miss rates (%) plus elapsed time and config string from perf file.
+    Only the requested fields are parsed, the others are returned as NaN (rates) or None (elapsed)."""
+    pattern = perf_regex(fields)
+    counters, elapsed = scan_perf_counters(filepath, pattern) if pattern else ({}, None)
+    l1_loads = counters.get(b'L1-dcache-loads')
+    l1_misses = counters.get(b'L1-dcache-load-misses')
+    llc_loads = counters.get(b'LLC-loads')
+    llc_misses = counters.get(b'LLC-load-misses')
+    cache_refs = counters.get(b'cache-references')
+    cache_misses = counters.get(b'cache-misses')
     base = os.path.basename(filepath)
     if "seq_perf_" in base:
         config = "sequential"
     else:
-        conf_match = re.search(r'(best|median|worst)_T(\d+)_S([\w]+)_C(\d+)', base)
+        conf_match = CONFIG_RE.search(base)
         if conf_match:
             _, threads, sched, chunk = conf_match.groups()
             config = f"{sched}, chunk={chunk}, th={threads}"
@@ -41,24 +79,16 @@ def parse_perf_file(filepath):
 
 def gather_matrix_files(root):
     """Collects only matrices where BOTH seq and best file are present."""
-    matrices = {}
-    par_dir = os.path.join(root, "parallel")
-    seq_dir = os.path.join(root, "sequential")
-    # Find all "best" files among parallel ones
-    for fname in os.listdir(par_dir):
-        mat_match = re.match(r'perf_(.+?)\.mtx_best_.*\.txt', fname)
-        if mat_match:
-            matrix = mat_match.group(1)
-            if matrix not in matrices:
-                matrices[matrix] = {"best_file": None, "seq_file": None}
-            matrices[matrix]["best_file"] = os.path.join(par_dir, fname)
-    for fname in os.listdir(seq_dir):
-        mat_match = re.match(r'seq_perf_(.+?)\.mtx\.txt', fname)
-        if mat_match:
-            matrix = mat_match.group(1)
-            if matrix not in matrices:
-                matrices[matrix] = {"best_file": None, "seq_file": None}
-            matrices[matrix]["seq_file"] = os.path.join(seq_dir, fname)
+    matrices = defaultdict(lambda: {"best_file": None, "seq_file": None})
+    sources = [(os.path.join(root, "parallel"), BEST_FILE_RE, "best_file"),
+               (os.path.join(root, "sequential"), SEQ_FILE_RE, "seq_file")]
+    # os.scandir yields names and full paths without extra stat/join calls
+    for folder, pattern, key in sources:
+        with os.scandir(folder) as it:
+            for entry in it:
+                mat_match = pattern.match(entry.name)
+                if mat_match:
+                    matrices[mat_match.group(1)][key] = entry.path
     # Remove matrices without both files
     matrices = {m: f for m, f in matrices.items() if f["best_file"] and f["seq_file"]}
     return matrices
@@ -75,19 +105,21 @@ def plot_best_vs_seq_misses(matrices, outfolder):
     for i, (matrix, files) in enumerate(sorted(matrices.items())):
         color = matrix_colors[i % len(matrix_colors)]
         # Parse sequential
-        l1, llc, cm, conf, _ = parse_perf_file(files["seq_file"])
+        l1, llc, cm, conf, _ = parse_perf_file(files["seq_file"], fields=("l1", "llc", "cm"))
         plot_data.append({'matrix':matrix, 'config':conf, 'rates':[l1, llc, cm], 'color':color})
         labels.append(f"{matrix}\n{conf}")
         # Parse best
-        l1, llc, cm, conf, _ = parse_perf_file(files["best_file"])
+        l1, llc, cm, conf, _ = parse_perf_file(files["best_file"], fields=("l1", "llc", "cm"))
         plot_data.append({'matrix':matrix, 'config':conf, 'rates':[l1, llc, cm], 'color':color})
         labels.append(f"{matrix}\n{conf}")
 
     xticks = np.arange(len(plot_data))
+    # Convert once: one row of rates per point (columns follow miss_types) and one color per point
+    rates = np.array([d['rates'] for d in plot_data], dtype=float).reshape(len(plot_data), len(miss_types))
+    colors = np.array([d['color'] for d in plot_data])
     fig, ax = plt.subplots(figsize=(max(10,len(plot_data)//2),6))
     for j, (miss_type, marker) in enumerate(zip(miss_types, miss_markers)):
-        ax.scatter(xticks, [d['rates'][j] for d in plot_data],
-                   c=[d['color'] for d in plot_data], marker=marker, s=90, label=miss_type, edgecolors='black')
+        ax.scatter(xticks, rates[:, j], c=colors, marker=marker, s=90, label=miss_type, edgecolors='black')
     ax.legend(title="Miss Type", fontsize=font_size, title_fontsize=font_size+1)
     ax.set_xticks(xticks)
     ax.set_xticklabels(labels, rotation=35, ha='right', fontsize=font_size-1)
@@ -98,6 +130,7 @@ def plot_best_vs_seq_misses(matrices, outfolder):
     plt.tight_layout()
     os.makedirs(outfolder, exist_ok=True)
     fig.savefig(os.path.join(outfolder, "seq_best_percentmiss_scatter.png"))
+    plt.close(fig)
 
 def main(perf_dir, outfolder):
     matrices = gather_matrix_files(perf_dir)
@@ -1,38 +1,10 @@
-import json
+import matplotlib
+matplotlib.use("Agg") # batch rendering only, no GUI backend
 import matplotlib.pyplot as plt
 import os
 import sys
-
-def load_json(filename):
-    with open(filename, 'r') as f:
-        return json.load(f)
-
-def extract_sequential_durations(data):
-    seq_durations = {}
-    for result in data['results']:
-        name = result['matrix']['name']
-        duration = result['statistics90']['duration_ms']
-        seq_durations[name] = duration
-    return seq_durations
-
-def extract_best_speedup_and_config(seq_json, par_json):
-    seq_durations = extract_sequential_durations(seq_json)
-    best_by_matrix = {}
-    for result in par_json['results']:
-        name = result['matrix']['name']
-        scenario = result['scenario']
-        threads = scenario['threads']
-        scheduling = scenario['scheduling_type'] if 'scheduling_type' in scenario else 'unknown'
-        chunk_size = scenario['chunk_size'] if 'chunk_size' in scenario else 'unknown'
-        duration = result['statistics90']['duration_ms']
-        if name not in seq_durations:
-            continue
-        speedup = seq_durations[name] / duration if duration > 0 else 0
-        if name not in best_by_matrix:
-            best_by_matrix[name] = {}
-        if threads not in best_by_matrix[name] or (speedup > best_by_matrix[name][threads][0]):
-            best_by_matrix[name][threads] = (speedup, scheduling, chunk_size)
-    return best_by_matrix
+from jsonLoader import load_json
+from speedUp import extract_best_speedup_and_config
 
 def plot_efficiency_annotate_right(sequential_file, parallel_file, output_folder):
     seq_json = load_json(sequential_file)
@@ -40,7 +12,7 @@ def plot_efficiency_annotate_right(sequential_file, parallel_file, output_folder
 
     best_by_matrix = extract_best_speedup_and_config(seq_json, par_json)
 
-    plt.figure(figsize=(12, 8))
+    fig = plt.figure(figsize=(12, 8))
     color_palette = ['#377eb8', '#ff7f00', '#4daf4a', '#e41a1c', '#984ea3']
 
     for idx, (matrix, vals_by_thread) in enumerate(best_by_matrix.items()):
@@ -90,6 +62,7 @@ def plot_efficiency_annotate_right(sequential_file, parallel_file, output_folder
     plt.tight_layout()
     os.makedirs(output_folder, exist_ok=True)
     plt.savefig(os.path.join(output_folder, 'spmv_efficiency.png'))
+    plt.close(fig)
 
 if __name__ == "__main__":
     if len(sys.argv) != 4:
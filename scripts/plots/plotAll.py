@@ -0,0 +1,52 @@
+# ========================================
+# Generate every plot in a single process.
+#
+# - Same plots and output files as running each script on its own.
+# - The JSON results are parsed once (jsonLoader cache) and shared by all the plots.
+# - The scheduling & chunk plot is drawn for every matrix found in both JSONs.
+# - --force also redraws the strong scalability plot when its cache stamp is up to date.
+# ========================================
+
+import matplotlib
+matplotlib.use("Agg") # batch rendering only, no GUI backend
+import matplotlib.pyplot as plt
+import sys
+from jsonLoader import load_results_by_matrix
+from memoryMisses import main as plot_memory_misses
+from parallelEfficency import plot_efficiency_annotate_right
+from rooflineModel import plot_roofline_clean
+from schedChunk import plot_sched_chunk_matrix
+from speedUp import plot_speedup_annotate_right
+from strongScalability import plot_strong_scalability_with_single_theory
+
+def plot_all(seq_file, par_file, perf_folder, output_folder, mem_bw, peak_flops, force=False):
+    plot_speedup_annotate_right(seq_file, par_file, output_folder)
+    # Only the strong scalability plot is cached, force redraws it like the others
+    plot_strong_scalability_with_single_theory(seq_file, par_file, output_folder, force)
+    plot_efficiency_annotate_right(seq_file, par_file, output_folder)
+    plot_roofline_clean(par_file, output_folder, mem_bw, peak_flops)
+
+    seq_matrices = load_results_by_matrix(seq_file)
+    fig, ax = plt.subplots(figsize=(14,8))
+    for matrix_name in load_results_by_matrix(par_file):
+        if matrix_name in seq_matrices:
+            plot_sched_chunk_matrix(matrix_name, seq_file, par_file, output_folder, fig, ax)
+
+    plot_memory_misses(perf_folder, output_folder)
+    plt.close('all')
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    force = "--force" in args
+    if force:
+        args.remove("--force")
+    if len(args) != 6:
+        print("Usage: python plotAll.py <sequential.json> <parallel.json> <perf_folder> <output_folder> <MEM_BW_GBps> <PEAK_FLOPS_GFLOPS> [--force]")
+        sys.exit(1)
+    seq_file = args[0]
+    par_file = args[1]
+    perf_folder = args[2]
+    output_folder = args[3]
+    mem_bw = float(args[4])
+    peak_flops = float(args[5])
+    plot_all(seq_file, par_file, perf_folder, output_folder, mem_bw, peak_flops, force)
@@ -1,47 +1,69 @@
-import json
+import matplotlib
+matplotlib.use("Agg") # batch rendering only, no GUI backend
 import matplotlib.pyplot as plt
 import numpy as np
 import os
 import sys
+from jsonLoader import load_json
 
-def load_json(filename):
-    with open(filename, 'r') as f:
-        return json.load(f)
+# Arithmetic intensity range (FLOPs/Byte) covered by the roofline
+OI_MIN, OI_MAX = 1e-2, 1e2
+
+def extract_result_columns(par_json):
+    # Two passes over the results: count the usable runs, then fill one typed buffer per field.
+    # The schema is fixed by ResultsManager::toJSON, which omits 'scenario' only for sequential results: those entries are skipped.
+    # Matrix names are stored as integer codes into the returned list of names.
+    results = [r for r in par_json['results'] if 'scenario' in r]
+    n = len(results)
+    columns = {
+        'matrix': np.empty(n, dtype=np.int32),
+        'gflops': np.empty(n, dtype=np.float64),
+        'intensity': np.empty(n, dtype=np.float64),
+        'threads': np.empty(n, dtype=np.int32),
+        'sched': np.empty(n, dtype=object),
+        'chunk': np.empty(n, dtype=np.int64),
+    }
+    codes = {}
+    for i, result in enumerate(results):
+        stats = result['statistics90']
+        scenario = result['scenario']
+        columns['matrix'][i] = codes.setdefault(result['matrix']['name'], len(codes))
+        columns['gflops'][i] = stats['GFLOPS']
+        columns['intensity'][i] = stats['Arithmetic_intensity']
+        columns['threads'][i] = scenario['threads']
+        columns['sched'][i] = scenario['scheduling_type']
+        columns['chunk'][i] = scenario['chunk_size']
+    return columns, list(codes)
 
 def extract_best_roofline_points(par_json):
-    # Pick highest GFLOPS run per matrix
+    # Pick highest GFLOPS run per matrix (first one on ties) in a single vectorized reduction:
+    # stable sort by (matrix, -GFLOPS), then keep the first row of every matrix group
+    columns, names = extract_result_columns(par_json)
+    order = np.lexsort((-columns['gflops'], columns['matrix']))
+    codes, first = np.unique(columns['matrix'][order], return_index=True)
+    best_rows = order[first]
     best_points = {}
-    for result in par_json['results']:
-        matrix = result['matrix']['name']
-        stats = result.get('statistics90', {})
-        gflops = stats.get('GFLOPS')
-        arith_intensity = stats.get('Arithmetic_intensity')
-        scenario = result.get('scenario', {})
-        sched = scenario.get('scheduling_type','unknown')
-        chunk = scenario.get('chunk_size','unknown')
-        threads = scenario.get('threads','?')
-        if gflops is None or arith_intensity is None:
-            continue
-        if matrix not in best_points or gflops > best_points[matrix]['gflops']:
-            best_points[matrix] = {
-                'gflops': gflops,
-                'intensity': arith_intensity,
-                'sched': sched,
-                'chunk': chunk,
-                'threads': threads
-            }
+    for code, best in zip(codes, best_rows):
+        best_points[names[code]] = {
+            'gflops': columns['gflops'][best],
+            'intensity': columns['intensity'][best],
+            'sched': columns['sched'][best],
+            'chunk': columns['chunk'][best],
+            'threads': columns['threads'][best]
+        }
     return best_points
 
 def plot_roofline_clean(parallel_file, output_folder, mem_bw, peak_flops):
     par_json = load_json(parallel_file)
     best_points = extract_best_roofline_points(par_json)
 
-    plt.figure(figsize=(10,7))
-    OI_range = np.logspace(-2, 2, 300)
-    theory = np.minimum(OI_range * mem_bw, peak_flops)
-    plt.plot(OI_range, theory, color='blue', linewidth=2, zorder=2)
-
+    fig = plt.figure(figsize=(10,7))
+    # The roofline is piecewise linear in log-log: only its end points and the ridge are needed
+    OI_range = np.array([OI_MIN, OI_MAX])
     ridge = peak_flops / mem_bw
+    roof_x = np.array([OI_MIN, min(max(ridge, OI_MIN), OI_MAX), OI_MAX])
+    plt.plot(roof_x, np.minimum(roof_x * mem_bw, peak_flops), color='blue', linewidth=2, zorder=2)
+
     plt.axvline(ridge, color='black', linewidth=1.5, linestyle='-', alpha=0.6, zorder=1)
     plt.annotate(f'Ridge: OI={ridge:.2f}',
                  xy=(ridge, ridge*mem_bw*0.8),
@@ -82,6 +104,7 @@ def plot_roofline_clean(parallel_file, output_folder, mem_bw, peak_flops):
     plt.tight_layout()
     os.makedirs(output_folder, exist_ok=True)
     plt.savefig(os.path.join(output_folder, "roofline_spmv_bestpoints_config.png"))
+    plt.close(fig)
 
 if __name__ == "__main__":
     if len(sys.argv) != 5:
@@ -5,84 +5,89 @@
 # - Plots speedup vs threads, color = scheduling, marker = chunk size.
 # - Sequential point included (thread 1).
 # - Output folder and file naming are dynamic based on matrix_name.
+# - Several matrices (comma separated) are drawn one after the other on the same reused figure.
 # ========================================
 
-import json
+import matplotlib
+matplotlib.use("Agg") # batch rendering only, no GUI backend
 import matplotlib.pyplot as plt
 import os
 import sys
+from collections import defaultdict, namedtuple
+from jsonLoader import load_results_by_matrix
 
-def load_json(filename):
-    with open(filename, 'r') as f:
-        return json.load(f)
-
-def get_sequential_duration(seq_json, matrix_name):
-    for result in seq_json['results']:
-        if result['matrix']['name'] == matrix_name:
-            return result['statistics90']['duration_ms']
+def get_sequential_duration(seq_by_matrix, matrix_name):
+    results = seq_by_matrix.get(matrix_name)
+    if results:
+        return results[0]['statistics90']['duration_ms']
     return None
 
-def get_parallel_runs_for_matrix(par_json, matrix_name):
+# One parallel run: a tuple is much lighter than a dict per record
+ParallelRun = namedtuple('ParallelRun', ['threads', 'scheduling', 'chunk_size', 'duration'])
+
+def get_parallel_runs_for_matrix(par_by_matrix, matrix_name):
     runs = []
-    for result in par_json['results']:
-        if result['matrix']['name'] == matrix_name:
-            scenario = result['scenario']
-            threads = scenario['threads']
-            scheduling = scenario.get('scheduling_type', 'unknown')
-            chunk_size = scenario.get('chunk_size', 'unknown')
-            duration = result['statistics90']['duration_ms']
-            runs.append({
-                'threads': threads,
-                'scheduling': scheduling,
-                'chunk_size': chunk_size,
-                'duration': duration
-            })
+    for result in par_by_matrix.get(matrix_name, []):
+        scenario = result['scenario']
+        threads = scenario['threads']
+        scheduling = scenario['scheduling_type']
+        chunk_size = scenario['chunk_size']
+        duration = result['statistics90']['duration_ms']
+        runs.append(ParallelRun(threads, scheduling, chunk_size, duration))
     return runs
 
 COLORBLIND_PALETTE = ['#0072B2', '#D55E00', '#009E73', '#F0E442', '#56B4E9', '#CC79A7', '#E69F00', '#000000']
 MARKER_LIST = ['o', 's', '^', 'D', 'P', '*', 'X', 'v']
 
 # Updated: allows output folder + dynamic file/title based on matrix_name
-def plot_sched_chunk_matrix(matrix_name, seq_file, par_file, output_folder):
-    seq_json = load_json(seq_file)
-    par_json = load_json(par_file)
-    seq_duration = get_sequential_duration(seq_json, matrix_name)
+# If an existing (fig, ax) is passed it is cleared and reused instead of creating a new figure
+def plot_sched_chunk_matrix(matrix_name, seq_file, par_file, output_folder, fig=None, ax=None):
+    # Results are grouped by matrix once per file and reused for every matrix plotted
+    seq_by_matrix = load_results_by_matrix(seq_file)
+    par_by_matrix = load_results_by_matrix(par_file)
+    seq_duration = get_sequential_duration(seq_by_matrix, matrix_name)
     if seq_duration is None:
         print("Sequential timing not found for selected matrix.")
         sys.exit(1)
-    runs = get_parallel_runs_for_matrix(par_json, matrix_name)
+    runs = get_parallel_runs_for_matrix(par_by_matrix, matrix_name)
     if not runs:
         print("No parallel experimental data for selected matrix.")
         sys.exit(1)
 
-    plt.figure(figsize=(14,8))
+    own_figure = ax is None
+    if own_figure:
+        fig, ax = plt.subplots(figsize=(14,8))
+    else:
+        ax.clear()
+
+    # Bucket the runs by (scheduling, chunk) in a single pass
+    buckets = defaultdict(list)
+    for run in runs:
+        buckets[(run.scheduling, run.chunk_size)].append(run)
 
     # Build mapping for scheduling/colors and chunk/markers
-    sched_types = sorted(set(run['scheduling'] for run in runs))
+    sched_types = sorted({sched for sched, _ in buckets})
     color_map = {sched: COLORBLIND_PALETTE[i % len(COLORBLIND_PALETTE)] for i, sched in enumerate(sched_types)}
-    chunk_sizes = sorted(set(run['chunk_size'] for run in runs))
+    chunk_sizes = sorted({chunk for _, chunk in buckets})
     marker_map = {chunk: MARKER_LIST[i % len(MARKER_LIST)] for i, chunk in enumerate(chunk_sizes)}
 
-    # Plot each curve for combo (scheduling, chunk)
-    for sched in sched_types:
-        sched_runs = [run for run in runs if run['scheduling'] == sched]
-        for chunk in chunk_sizes:
-            combo_runs = [run for run in sched_runs if run['chunk_size'] == chunk]
-            if not combo_runs:
-                continue
-            combo_runs = sorted(combo_runs, key=lambda r: r['threads'])
-            threads = [r['threads'] for r in combo_runs]
-            speedups = [seq_duration / r['duration'] if r['duration'] > 0 else 0 for r in combo_runs]
-
-            # Always start each curve at thread=1, speedup=1
-            threads = [1] + threads
-            speedups = [1.0] + speedups
-
-            color = color_map[sched]
-            marker = marker_map[chunk]
-            label = f"{sched}, chunk={chunk}"
-            plt.scatter([1], [1.0], color='black', marker='o', s=120, zorder=10)
-            plt.plot(threads, speedups, color=color, marker=marker, label=label, linewidth=2)
+    # Sequential reference point shared by every curve, drawn once
+    ax.scatter([1], [1.0], color='black', marker='o', s=120, zorder=10)
+
+    # Plot each curve for combo (scheduling, chunk), sorted to keep a stable legend order
+    for sched, chunk in sorted(buckets):
+        combo_runs = sorted(buckets[(sched, chunk)], key=lambda r: r.threads)
+        threads = [r.threads for r in combo_runs]
+        speedups = [seq_duration / r.duration if r.duration > 0 else 0 for r in combo_runs]
+
+        # Always start each curve at thread=1, speedup=1
+        threads = [1] + threads
+        speedups = [1.0] + speedups
+
+        color = color_map[sched]
+        marker = marker_map[chunk]
+        label = f"{sched}, chunk={chunk}"
+        ax.plot(threads, speedups, color=color, marker=marker, label=label, linewidth=2)
 
     # Make folder if needed
     os.makedirs(output_folder, exist_ok=True)
@@ -91,22 +96,29 @@ def plot_sched_chunk_matrix(matrix_name, seq_file, par_file, output_folder):
     output_file = f"{output_folder}/speedup_sched_chunk_{safe_matrix}.png"
     plot_title = f"Speedup for matrix '{matrix_name}' by Scheduling & Chunk Size"
 
-    plt.xlabel("Number of Threads (1 = sequential)")
-    plt.ylabel("Speedup (Sequential / Parallel Time)")
-    plt.title(plot_title)
-    plt.xticks([1,2,4,8,16,32], ["1","2","4","8","16","32"])
-    plt.grid(True, linestyle=':')
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(output_file)
+    ax.set_xlabel("Number of Threads (1 = sequential)")
+    ax.set_ylabel("Speedup (Sequential / Parallel Time)")
+    ax.set_title(plot_title)
+    ax.set_xticks([1,2,4,8,16,32])
+    ax.set_xticklabels(["1","2","4","8","16","32"])
+    ax.grid(True, linestyle=':')
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(output_file)
+    if own_figure:
+        plt.close(fig)
 
 # --- Accept output folder as third argument
 if __name__ == "__main__":
     if len(sys.argv) != 5:
-        print("Usage: python plot_sched_chunk_matrix.py <matrix_name> <sequential.json> <parallel.json> <output_folder>")
+        print("Usage: python plot_sched_chunk_matrix.py <matrix_name[,matrix_name...]> <sequential.json> <parallel.json> <output_folder>")
         sys.exit(1)
-    matrix_name = sys.argv[1]
+    matrix_names = sys.argv[1].split(",")
     seq_file = sys.argv[2]
     par_file = sys.argv[3]
     output_folder = sys.argv[4]
-    plot_sched_chunk_matrix(matrix_name, seq_file, par_file, output_folder)
+    # One figure for all the requested matrices, cleared between plots
+    fig, ax = plt.subplots(figsize=(14,8))
+    for matrix_name in matrix_names:
+        plot_sched_chunk_matrix(matrix_name, seq_file, par_file, output_folder, fig, ax)
+    plt.close(fig)
@@ -1,16 +1,14 @@
-import json
+import matplotlib
+matplotlib.use("Agg") # batch rendering only, no GUI backend
 import matplotlib.pyplot as plt
 import os
 import sys
+from jsonLoader import load_json
 
 # Speedup plot (linear axes): speedup vs number of threads.
 # Shows best speedup per thread count for each matrix in color with marker.
 # Annotates the maximum speedup point with scheduling type and chunk size to the right.
 
-def load_json(filename):
-    with open(filename, 'r') as f:
-        return json.load(f)
-
 def extract_sequential_durations(data):
     seq_durations = {}
     for result in data['results']:
@@ -21,21 +19,25 @@ def extract_sequential_durations(data):
 
 def extract_best_speedup_and_config(seq_json, par_json):
     seq_durations = extract_sequential_durations(seq_json)
-    best_by_matrix = {}
+    # Aggregate first: keep only the fastest run per (matrix, threads)
+    fastest = {}
     for result in par_json['results']:
         name = result['matrix']['name']
-        scenario = result['scenario']
-        threads = scenario['threads']
-        scheduling = scenario['scheduling_type'] if 'scheduling_type' in scenario else 'unknown'
-        chunk_size = scenario['chunk_size'] if 'chunk_size' in scenario else 'unknown'
-        duration = result['statistics90']['duration_ms']
         if name not in seq_durations:
             continue
+        scenario = result['scenario']
+        scheduling = scenario['scheduling_type']
+        chunk_size = scenario['chunk_size']
+        duration = result['statistics90']['duration_ms']
+        key = (name, scenario['threads'])
+        rank = duration if duration > 0 else float('inf') # invalid timings never win
+        if key not in fastest or rank < fastest[key][0]:
+            fastest[key] = (rank, duration, scheduling, chunk_size)
+    # Then join with the sequential durations, one division per (matrix, threads)
+    best_by_matrix = {}
+    for (name, threads), (_, duration, scheduling, chunk_size) in fastest.items():
         speedup = seq_durations[name] / duration if duration > 0 else 0
-        if name not in best_by_matrix:
-            best_by_matrix[name] = {}
-        if threads not in best_by_matrix[name] or (speedup > best_by_matrix[name][threads][0]):
-            best_by_matrix[name][threads] = (speedup, scheduling, chunk_size)
+        best_by_matrix.setdefault(name, {})[threads] = (speedup, scheduling, chunk_size)
     return best_by_matrix
 
 def plot_speedup_annotate_right(sequential_file, parallel_file, output_folder):
@@ -44,7 +46,7 @@ def plot_speedup_annotate_right(sequential_file, parallel_file, output_folder):
 
     best_by_matrix = extract_best_speedup_and_config(seq_json, par_json)
 
-    plt.figure(figsize=(12, 8))
+    fig = plt.figure(figsize=(12, 8))
     color_palette = ['#377eb8', '#ff7f00', '#4daf4a', '#e41a1c', '#984ea3']
 
     for idx, (matrix, vals_by_thread) in enumerate(best_by_matrix.items()):
@@ -94,6 +96,7 @@ def plot_speedup_annotate_right(sequential_file, parallel_file, output_folder):
     plt.tight_layout()
     os.makedirs(output_folder, exist_ok=True)
     plt.savefig(os.path.join(output_folder, 'spmv_speedup.png'))
+    plt.close(fig)
     
 if __name__ == "__main__":
     if len(sys.argv) != 4:
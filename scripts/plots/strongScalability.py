@@ -1,100 +1,163 @@
-import json
+import matplotlib
+matplotlib.use("Agg") # batch rendering only, no GUI backend
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+import math
+import numpy as np
 import os
 import sys
+import jsonLoader
+from jsonLoader import iter_results
+
+# Content hash of the inputs for the incremental plot cache: xxhash when available, hashlib otherwise
+try:
+    import xxhash
+    new_hasher = xxhash.xxh64
+except ImportError:
+    import hashlib
+    new_hasher = hashlib.blake2b
 
 # Strong scalability plot (log-log axes): duration (ms) vs number of threads.
 # Real best performance data for each matrix shown in color.
 # A single dashed gray line represents theoretical scalability (T_seq/p) in legend.
 
-def load_json(filename):
-    # Load and parse a JSON file
-    with open(filename, 'r') as f:
-        return json.load(f)
+SAVE_DPI = 100
+# Thread counts of the sweep: shared x values of every curve (1 = sequential)
+CANON_T = np.array([1, 2, 4, 8, 16, 32])
 
-def extract_sequential_durations(data):
-    # Extracts sequential duration (ms) for each matrix
+def extract_sequential_durations(filename):
+    # Extracts sequential duration (ms) for each matrix, streaming the results
     seq_durations = {}
-    for result in data['results']:
-        name = result['matrix']['name']
+    for result in iter_results(filename):
+        name = sys.intern(result['matrix']['name'])  # interned: key lookups on repeated names can skip the string compare
         duration = result['statistics90']['duration_ms']  # 90th percentile duration
         seq_durations[name] = duration
     return seq_durations
 
-def extract_parallel_best_duration_by_threads(data):
-    # Extracts the best (minimum) duration per thread count for each matrix
-    parallel_best_duration = {}
-    for result in data['results']:
-        name = result['matrix']['name']
-        scenario = result['scenario']
-        threads = scenario['threads']
-        duration = result['statistics90']['duration_ms']
-        if name not in parallel_best_duration:
-            parallel_best_duration[name] = {}
-        # Save only the minimum duration for each thread count
-        if threads not in parallel_best_duration[name]:
-            parallel_best_duration[name][threads] = duration
-        elif duration < parallel_best_duration[name][threads]:
-            parallel_best_duration[name][threads] = duration
-    return parallel_best_duration
-
-def plot_strong_scalability_with_single_theory(sequential_file, parallel_file, output_folder):
+def extract_parallel_best_duration_by_threads(filename):
+    # Extracts the best (minimum) duration per (matrix, thread count), streaming the results.
+    # Returns the matrix names in sweep order and a flat dict keyed by (name, threads).
+    names = {}  # insertion-ordered set of the matrix names
+    best = {}
+    get = best.get  # bound once, called per result
+    inf = math.inf  # sentinel for unseen keys: the update is a single compare
+    for result in iter_results(filename):
+        name = sys.intern(result['matrix']['name'])
+        key = (name, int(result['scenario']['threads']))
+        duration = float(result['statistics90']['duration_ms'])
+        names[name] = None
+        if duration < get(key, inf):
+            best[key] = duration
+    return list(names), best
+
+def inputs_digest(*filenames):
+    # Hashes the render version (this script's source, which holds SAVE_DPI, CANON_T and the styling,
+    # jsonLoader's source, which decides how the inputs are parsed, and the matplotlib version)
+    # and the contents of the input files, read in 1 MiB blocks
+    h = new_hasher()
+    h.update(matplotlib.__version__.encode())
+    for filename in (os.path.abspath(__file__), os.path.abspath(jsonLoader.__file__)) + filenames:
+        with open(filename, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    return h.hexdigest()
+
+def plot_strong_scalability_with_single_theory(sequential_file, parallel_file, output_folder, force=False):
     # Main plotting routine: draws one colored line per matrix for performance,
     # plus a single dashed gray line for theoretical scalability in the legend.
-    seq_json = load_json(sequential_file)
-    par_json = load_json(parallel_file)
-
-    seq_durations = extract_sequential_durations(seq_json)
-    parallel_best_durations = extract_parallel_best_duration_by_threads(par_json)
+    # Incremental cache: a sidecar stamp stores the hash of the render version and inputs the PNG was drawn from,
+    # when none of them changed all the parsing and matplotlib work is skipped (force=True always redraws)
+    output_file = os.path.join(output_folder, "spmv_strong_scalability.png")
+    stamp_file = output_file + ".hash"
+    digest = inputs_digest(sequential_file, parallel_file)
+    if not force and os.path.exists(output_file) and os.path.exists(stamp_file):
+        with open(stamp_file) as f:
+            if f.read() == digest:
+                return
+    seq_durations = extract_sequential_durations(sequential_file)
+    matrix_names, parallel_best_durations = extract_parallel_best_duration_by_threads(parallel_file)
 
-    plt.figure(figsize=(12, 8))
+    fig, ax = plt.subplots(figsize=(12, 8))
     # Use a colorblind-friendly palette and distinct marker shapes
     color_palette = ['#377eb8', '#ff7f00', '#4daf4a', '#e41a1c', '#984ea3']
     markers = ['o', 's', '^', 'D', 'v']
 
-    theory_plotted = False  # Ensure theoretical line has only one legend entry
+    # Measured curves are batched: one LineCollection for all the lines,
+    # one scatter per marker shape, and legend entries built from proxy handles
+    segments, segment_colors, legend_handles = [], [], []
+    marker_points = {}  # marker -> (x list, y list, color list)
+    # Theoretical T_seq/p curves of all matrices, NaN-separated so they are drawn as a single line artist
+    theory_x, theory_y = [], []
 
-    for idx, (matrix, durations_by_threads) in enumerate(parallel_best_durations.items()):
-        # Get sorted thread counts, always include 1 (sequential) first
-        threads_list = sorted([t for t in durations_by_threads if t != 1])
-        x_vals = [1] + threads_list
-        y_vals = [seq_durations[matrix] if matrix in seq_durations else 0]
-        # Add parallel durations
-        for t in threads_list:
-            y_vals.append(durations_by_threads[t])
+    # Thread counts outside the canonical axis are not drawn: report them instead of dropping them silently
+    canon = set(CANON_T.tolist())
+    extra_threads = sorted({t for _, t in parallel_best_durations} - canon)
+    if extra_threads:
+        print(f"Warning: thread counts {extra_threads} are not in {CANON_T.tolist()} and are not plotted.")
+
+    get_best = parallel_best_durations.get
+    for idx, matrix in enumerate(matrix_names):
+        # Same x values for every matrix, thread counts missing from the sweep are left out of the curve
+        # (so a sparse sweep, e.g. THREADS=(2 32), is still drawn as one connected line)
+        y_vals = np.array([seq_durations.get(matrix, np.nan)]
+                          + [get_best((matrix, t), np.nan) for t in CANON_T[1:].tolist()])
+        seg = np.column_stack((CANON_T, y_vals))
+        seg = seg[~np.isnan(seg[:, 1])]
         color = color_palette[idx % len(color_palette)]
         marker = markers[idx % len(markers)]
-        # Plot measured performance
-        plt.plot(x_vals, y_vals, marker=marker, color=color, label=matrix, linewidth=2)
-        # Compute theoretical: T_seq/p for each thread count,
-        # plot single dashed gray curve with legend label only once
-        theoretical = [y_vals[0] / t for t in x_vals]
-        if not theory_plotted:
-            plt.plot(x_vals, theoretical, linestyle='--', color='gray', linewidth=2,
-                     label="theoretical scalability (T_seq/p)")
-            theory_plotted = True
-        else:
-            plt.plot(x_vals, theoretical, linestyle='--', color='gray', linewidth=2)
-
-    plt.xlabel('Number of Threads (1 = Sequential)')
-    plt.ylabel('Duration Time (ms)')
-    plt.title('Strong Scalability of SpMV: \nDuration vs Threads per Matrix (Log-Log)')
-    plt.grid(True, which='both', linestyle=':')
-    plt.xscale('log')
-    plt.yscale('log')
-    plt.xticks([1, 2, 4, 8, 16, 32], ["1", "2", "4", "8", "16", "32"])
-    plt.legend()
-    plt.tight_layout()
+        # Collect measured performance
+        segments.append(seg)
+        segment_colors.append(color)
+        xs, ys, cs = marker_points.setdefault(marker, ([], [], []))
+        xs.extend(seg[:, 0])
+        ys.extend(seg[:, 1])
+        cs.extend([color] * len(seg))
+        legend_handles.append(Line2D([], [], marker=marker, color=color, label=matrix, linewidth=2))
+        # Theoretical T_seq/p is a straight line (slope -1) in log-log: its two end points are enough,
+        # the last one at the largest thread count actually measured
+        p_max = seg[-1, 0] if len(seg) else 1
+        theory_x += [1, p_max, np.nan]
+        theory_y += [y_vals[0], y_vals[0] / p_max, np.nan]
+
+    ax.add_collection(LineCollection(segments, colors=segment_colors, linewidths=2, zorder=2))
+    for marker, (xs, ys, cs) in marker_points.items():
+        ax.scatter(xs, ys, c=cs, marker=marker, s=plt.rcParams['lines.markersize'] ** 2, zorder=2)
+
+    # Single dashed gray artist (and legend entry) kept below the measured curves
+    if theory_x:
+        legend_handles += ax.plot(theory_x, theory_y, linestyle='--', color='gray',
+                                  linewidth=2, zorder=1.5, label="theoretical scalability (T_seq/p)")
+    ax.autoscale_view()
+
+    ax.set_xlabel('Number of Threads (1 = Sequential)')
+    ax.set_ylabel('Duration Time (ms)')
+    ax.set_title('Strong Scalability of SpMV: \nDuration vs Threads per Matrix (Log-Log)')
+    ax.grid(True, which='both', linestyle=':')
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xticks(CANON_T)
+    ax.set_xticklabels([str(t) for t in CANON_T])
+    ax.legend(handles=legend_handles)
+    fig.tight_layout()
 
     os.makedirs(output_folder, exist_ok=True)
-    plt.savefig(os.path.join(output_folder, "spmv_strong_scalability.png"))
+    # Fixed raster resolution, no bbox_inches='tight' (it would cost an extra render pass)
+    fig.savefig(output_file, dpi=SAVE_DPI)
+    plt.close(fig)
+    with open(stamp_file, 'w') as f:
+        f.write(digest)
 
 if __name__ == "__main__":
-    # Usage: python plot_scalability.py sequential.json parallel.json output_folder
-    if len(sys.argv) != 4:
-        print("Usage: python plot_scalability.py <sequential.json> <parallel.json> <output_folder>")
+    # Usage: python plot_scalability.py sequential.json parallel.json output_folder [--force]
+    args = sys.argv[1:]
+    force = "--force" in args
+    if force:
+        args.remove("--force")
+    if len(args) != 3:
+        print("Usage: python plot_scalability.py <sequential.json> <parallel.json> <output_folder> [--force]")
         sys.exit(1)
-    sequential_file = sys.argv[1]
-    parallel_file = sys.argv[2]
-    output_folder = sys.argv[3]
-    plot_strong_scalability_with_single_theory(sequential_file, parallel_file, output_folder)
\ No newline at end of file
+    sequential_file = args[0]
+    parallel_file = args[1]
+    output_folder = args[2]
+    plot_strong_scalability_with_single_theory(sequential_file, parallel_file, output_folder, force)
@@ -4,38 +4,54 @@
     It's used after running the full parameter sweep to identify key configurations
     for further analysis, like perf profiling.
 """
-import json
+import os
 import sys
+from operator import itemgetter
 
-def median_item(items, key_func):
-    sorted_items = sorted(items, key=key_func)
-    n = len(sorted_items)
-    if n == 0:
-        return None
-    mid = n // 2
-    if n % 2 == 1:
-        return sorted_items[mid]
-    else:
-        return sorted_items[mid-1]
+# Shared loader (orjson/ijson when available, stdlib json otherwise) lives next to the plot scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "plots"))
+from jsonLoader import iter_results
+
+# Output line template and the scenario fields it prints, both built once
+CONFIG_LINE = "%s %s %s %s %s\n"
+SCENARIO_FIELDS = itemgetter("threads", "scheduling_type", "chunk_size")
+
+def median_index(gflops):
+    """Returns the index of the lower middle element of the stable order by GFLOPS."""
+    order = sorted(range(len(gflops)), key=gflops.__getitem__)
+    return order[(len(order) - 1) // 2]
 
 def main(json_file, output_file):
-    with open(json_file) as f:
-        data = json.load(f)
+    # Group by matrix while streaming: best and worst are running aggregates (first one on ties),
+    # only the GFLOPS of every run and its scenario are kept for the median
+    groups = {}
+    for entry in iter_results(json_file):
+        name = sys.intern(entry["matrix"]["name"])
+        gflops = entry["statistics90"]["GFLOPS"]
+        scenario = entry["scenario"]
+        group = groups.get(name)
+        if group is None:
+            groups[name] = {"best": (gflops, scenario), "worst": (gflops, scenario),
+                            "gflops": [gflops], "scenarios": [scenario]}
+            continue
+        if gflops > group["best"][0]:
+            group["best"] = (gflops, scenario)
+        elif gflops < group["worst"][0]:
+            group["worst"] = (gflops, scenario)
+        group["gflops"].append(gflops)
+        group["scenarios"].append(scenario)
 
-    by_matrix = {}
-    for entry in data["results"]:
-        m = entry["matrix"]["name"]
-        by_matrix.setdefault(m, []).append(entry)
+    lines = []
+    for m, group in groups.items():
+        best = group["best"][1]
+        worst = group["worst"][1]
+        median = group["scenarios"][median_index(group["gflops"])]
+        for label, scenario in (("best", best), ("worst", worst), ("median", median)):
+            lines.append(CONFIG_LINE % ((m, label) + SCENARIO_FIELDS(scenario)))
 
+    # Single buffered write of the whole selection
     with open(output_file, "w") as out:
-        for m, entries in by_matrix.items():
-            best = max(entries, key=lambda e: e["statistics90"]["GFLOPS"])
-            worst = min(entries, key=lambda e: e["statistics90"]["GFLOPS"])
-            median = median_item(entries, key_func=lambda e: e["statistics90"]["GFLOPS"])
-            out.write(f"{m} best {best['scenario']['threads']} {best['scenario']['scheduling_type']} {best['scenario']['chunk_size']}\n")
-            out.write(f"{m} worst {worst['scenario']['threads']} {worst['scenario']['scheduling_type']} {worst['scenario']['chunk_size']}\n")
-            if median:
-                out.write(f"{m} median {median['scenario']['threads']} {median['scenario']['scheduling_type']} {median['scenario']['chunk_size']}\n")
+        out.writelines(lines)
 
 if __name__ == "__main__":
     if len(sys.argv) != 3: